@@ -3,9 +3,9 @@
 srcdir=./src
 
 # run
-python3 $srcdir/server.py "$@";
+PYTHONPATH=$srcdir python3 -m snowserve "$@";
 server_pid=$$
 
 # once done, clean up junk files
-rm -f $srcdir/*.pyc;
+rm -rf $srcdir/snowserve/__pycache__;
 
@@ -0,0 +1,28 @@
+# A small multithreaded HTTP server. Embedders can create and start a server
+# like so:
+#
+#       import snowserve
+#       server = snowserve.create_server({"port": 8080})
+#       server.start()
+#
+# Or run it from the command line with "python3 -m snowserve".
+#
+#   Connor Shugg
+
+# The names below are imported from their modules the first time they're
+# used, so that importing the package (which "python3 -m snowserve" always
+# does first) doesn't load the whole server before the startup clock starts
+LAZY_NAMES = {
+    "Server": "server",
+    "create_server": "server",
+    "Endpoint": "endpoints",
+    "EndpointRegistry": "endpoints",
+}
+
+# Looks up one of the LAZY_NAMES, importing its module on first use
+def __getattr__(name):
+    if (name not in LAZY_NAMES):
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    import importlib
+    module = importlib.import_module("." + LAZY_NAMES[name], __name__)
+    return getattr(module, name)
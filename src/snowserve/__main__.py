@@ -0,0 +1,15 @@
+# Entry point for "python3 -m snowserve". The package's __init__ doesn't
+# import any of the server's modules, so the start time taken here comes
+# before the server's imports, socket setup, and thread spawning, and the
+# reported startup latency covers all of them. (Interpreter startup itself
+# happens before any of our code runs, so it isn't counted.)
+#
+#   Connor Shugg
+
+from time import perf_counter
+START_TIME = perf_counter()
+
+from .server import main
+
+if (__name__ == "__main__"):
+    main(START_TIME)
@@ -0,0 +1,191 @@
+# The portion of my web server responsible for handling client connections
+# accepted by the accepter threads.
+#
+#   Connor Shugg
+#   May 2020
+
+# Library inclusions
+import threading        # for multithreaded client-handling
+import sys              # for sys.exit()
+
+# Modudle inclusions
+from .sockets import SocketTalker            # for server-client communication
+from .http_messages import HTTPRequest       # for request message parsing
+from .http_messages import HTTPEnforcer      # for request rule checking
+from .http_messages import HTTPParseError    # for request error checking
+
+# Global variables
+HEAD_LIMIT = 8192       # the maximum size of a request's start line + headers
+
+# ========================= Client Thread Class ============================= #
+# A class that defines a thread tasked with handling a single client connection
+class ClientThread (threading.Thread):
+    # Constructor: takes in a verbose switch, an accepted client socket, a
+    # thread ID, and (optionally) the EndpointRegistry to hand requests to and
+    # the SharedStats to count requests in
+    def __init__(self, v, csock, t, registry = None, stats = None):
+        # invoke the parent constructor
+        threading.Thread.__init__(self, target=self.converse)
+
+        # set up class fields
+        self.verbose = v
+        self.talker = SocketTalker(self.verbose, csock)
+        self.tid = t
+        self.registry = registry
+        self.stats = stats
+    
+    # The main function for a client thread that's used to 'converse' with the
+    # client through the client socket
+    def converse(self):
+        self.vprint("Spawned.")
+        
+        # read the start line and headers from the client. If nothing was
+        # read, we assume the client has closed the socket: end the
+        # connection. If an exception occurs, print it out have the thread
+        # gracefully exit
+        data = None
+        try:
+            data = self.read_head()
+        except Exception as e:
+            self.vprint("Error: could not read client data:\n%s" % str(e))
+            self.exit()
+        # if an exception wasn't thrown, but no data was read, exit
+        if (data == None):
+            self.exit()
+        
+        # otherwise, we can assume SOME sort of data was read from the socket
+        (head, leftover) = data
+        try:
+            self.transact(head, leftover)
+        except Exception as e:
+            # whatever went wrong, the connection still gets closed below
+            self.vprint("Error: could not complete transaction:\n%s" % str(e))
+
+        # close the connection and have the thread exit
+        self.vprint("Exiting.")
+        self.exit()
+    
+    # Reads from the client until the blank line that ends the headers has
+    # been seen. Returns a tuple of (head, leftover): the raw start line and
+    # headers, and any body bytes that came in with them. Returns None if the
+    # client closed the socket before sending anything
+    def read_head(self):
+        buf = b""
+        while (b"\r\n\r\n" not in buf):
+            # don't let a client feed us headers forever
+            if (len(buf) > HEAD_LIMIT):
+                break
+            chunk = self.talker.read()
+            # if the socket was closed, go with whatever we have
+            if (chunk == None):
+                break
+            buf += chunk
+        
+        if (len(buf) == 0):
+            return None
+        # split off the body bytes (if any) that were read with the headers
+        (head, sep, leftover) = buf.partition(b"\r\n\r\n")
+        return (head + sep, leftover)
+
+    # The function that's run when the thread exits
+    def exit(self):
+        # close the socket and exit
+        self.talker.close()
+        if (self.stats != None):
+            self.stats.increment("connections_closed")
+        sys.exit()
+    
+    # Takes in the raw start line and headers, plus any body bytes read in
+    # with them, and attempts to complete a single transaction
+    def transact(self, head, leftover=b""):
+        if (head == None):
+            return
+        
+        # if the headers never ended before we hit the limit, don't bother
+        # trying to parse them
+        if (len(head) > HEAD_LIMIT):
+            if (self.stats != None):
+                self.stats.increment("requests")
+                self.stats.increment("parse_errors")
+            self.talker.write("HTTP 200 OK\r\n\r\nParse Error: %d" %
+                              int(HTTPParseError.REQUEST_TOO_LONG))
+            return
+
+        # attempt to parse the data into a HTTPRequest object. If the parsing
+        # fails (one example: unable to decode a certain byte into utf-8),
+        # return from the function so the thread can gracefully exit
+        req = None
+        parse_error = -1
+        try:
+            # initialize the HTTPRequest object. Targets with registered
+            # endpoints are allowed on top of the enforcer's defaults
+            enforcer = None
+            if (self.registry != None):
+                enforcer = HTTPEnforcer(self.registry)
+            req = HTTPRequest(str(head, "utf-8"), enforcer)
+            # parse the client's data, then hook the message body (if there
+            # is one) up to the socket so it can be streamed in
+            parse_error = req.parse()
+            if (not parse_error):
+                parse_error = req.attach_body(self.talker, leftover)
+        except Exception as e:
+            # on error, print the exception and exit the thread
+            self.vprint("Error: could not parse client data:\n%s" % str(e))
+            if (self.stats != None):
+                self.stats.increment("requests")
+                self.stats.increment("parse_errors")
+            self.exit()
+
+        # count the request
+        if (self.stats != None):
+            self.stats.increment("requests")
+            if (parse_error):
+                self.stats.increment("parse_errors")
+
+        # hand the request off, making sure any body that was spooled to disk
+        # gets cleaned up however the endpoint fares
+        try:
+            self.dispatch(req, parse_error)
+        finally:
+            if (req.body != None):
+                req.body.close()
+
+    # Takes in a parsed request and its parse result. If the request parsed
+    # cleanly and an endpoint is registered for its target, the request is
+    # assigned to it (the endpoint is imported on first use). Otherwise, the
+    # parse result is reported back to the client
+    def dispatch(self, req, parse_error):
+        endpoint = None
+        if (not parse_error and self.registry != None):
+            # an endpoint that's registered but can't be loaded is a broken
+            # route, not a missing one: report it as a server error
+            try:
+                endpoint = self.registry.lookup(req.target)
+            except Exception as e:
+                self.vprint("Error: could not load endpoint for %s:\n%s" %
+                            (req.target, str(e)))
+                self.talker.write("HTTP/1.1 500 Internal Server Error\r\n\r\n")
+                return
+        if (endpoint == None):
+            self.talker.write("HTTP 200 OK\r\n\r\nParse Error: %d" % int(parse_error))
+            return
+
+        # endpoints are loaded from outside the server, so don't let one that
+        # throws take the thread down with the connection still open
+        try:
+            response = endpoint.assign(req)
+        except Exception as e:
+            self.vprint("Error: endpoint for %s failed:\n%s" %
+                        (req.target, str(e)))
+            self.talker.write("HTTP/1.1 500 Internal Server Error\r\n\r\n")
+            return
+        if (response != None):
+            self.talker.write(response)
+
+
+    # ------------------------- Utility Functions --------------------------- #
+    # Prints the string only if self.verbose is True
+    def vprint(self, msg):
+        if (self.verbose):
+            print("Client [ID %d] %s" % (self.tid, msg))
+
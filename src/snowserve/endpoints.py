@@ -0,0 +1,184 @@
+# The portion of my web server responsible for handling URL endpoints. An
+# endpoint could be a static file or a script execution
+#
+#   Connor Shugg
+#   September 2020
+
+# Library inclusions
+import abc              # "Abstract Base Classes"
+import importlib        # for importing endpoint modules on demand
+import threading        # for guarding the registry across client threads
+
+# Global variables
+ENTRY_POINT_GROUP = "snowserve.endpoints"
+
+
+# ======================== Endpoint 'Template' Class ======================== #
+# This class represents a 'template' for an Endpoint. Endpoints must implement
+# this function:
+#       assign()        This is what the client thread calls to perform the
+#                       endpoint's task. Takes in a HTTPRequest object
+#       get_target()    This is used to retrieve the Endpoint's target URL
+# Endpoints must also have the following property(s):
+#       target          This is the target URL the endpoint is responsible for
+#
+# Endpoints may have child Endpoints. If a parent Endpoint is assigned a
+# request whose target has a child's endpoint at the end of the URL, the parent
+# can assign its child the request.
+#
+# This class is defined as an abstract class. See below for documentation:
+# https://docs.python.org/3/library/abc.html
+class Endpoint(abc.ABC):
+    # Constructor: takes in an optional 'verbose' switch
+    def __init__(self, verbose):
+        self.verbose = verbose
+        self.target = "/"
+        self.children = None
+    
+    # Abstract method whose sole purpose is to return a string: the endpoint's
+    # target URL
+    @abc.abstractmethod
+    def get_target(self):
+        return self.target
+    
+    # An abstract method that takes in an HTTP request, handles it, and returns
+    # a HTTPResponse object. This function is used by client threads to "assign"
+    # a request to an endpoint.
+    #
+    # If the request has a message body, 'request.body' is a HTTPRequestBody
+    # stream (otherwise it's None). Endpoints should walk it with
+    # 'request.body.chunks()', or call 'request.body.spool()' to get the whole
+    # thing as a file object (large bodies are spooled to disk). If the body is
+    # never read, it's never pulled off the socket - so a client that sent
+    # "Expect: 100-continue" is never told to send it.
+    @abc.abstractmethod
+    def assign(self, request):
+        return
+    
+
+    # ------------------------- Utility Functions --------------------------- #
+    # Prints the string only if self.verbose is True
+    def vprint(self, msg):
+        if (self.verbose):
+            print("Endpoint [%s] %s" % (self.target, msg))
+
+
+# ========================= Endpoint Registry Class ========================= #
+# A class that maps target URLs to Endpoints. Endpoints are registered by
+# 'spec' rather than by object: either a "module:Class" string or an entry
+# point (from the "snowserve.endpoints" group, where the entry point's name is
+# the target URL). Nothing is imported until a request for that target
+# actually comes in, so the server can start accepting connections without
+# paying for every endpoint's imports up front. Even the entry points aren't
+# scanned until a request comes in for a target that isn't already known.
+class EndpointRegistry:
+    # Constructor: takes in a verbose switch
+    def __init__(self, verbose):
+        self.verbose = verbose
+        self.specs = {}         # target URL --> spec, for unloaded endpoints
+        self.endpoints = {}     # target URL --> loaded Endpoint object
+        self.pending_group = None   # entry point group still to be scanned
+        self.lock = threading.Lock()
+
+    # Takes in a target URL and a spec ("module:Class" string or entry point)
+    # and registers it. The endpoint isn't loaded until lookup() needs it
+    def register(self, target, spec):
+        with self.lock:
+            self.specs[target] = spec
+            self.endpoints.pop(target, None)
+
+    # Registers every endpoint advertised by installed packages under the
+    # given entry point group. Scanning installed packages is slow, so this
+    # only remembers the group; the scan happens the first time a request
+    # comes in for a target that isn't registered otherwise
+    def load_entry_points(self, group=ENTRY_POINT_GROUP):
+        with self.lock:
+            self.pending_group = group
+
+    # Scans the pending entry point group, if there is one. Endpoints that were
+    # registered directly win over entry points with the same target. The lock
+    # must be held by the caller
+    def scan_entry_points(self):
+        if (self.pending_group == None):
+            return
+        group = self.pending_group
+        self.pending_group = None
+        # importlib.metadata is slow to import, so only pay for it here
+        import importlib.metadata
+        self.vprint("Scanning entry points in %s" % group)
+        for ep in importlib.metadata.entry_points(group=group):
+            self.specs.setdefault(ep.name, ep)
+
+    # Returns a list of every target URL that has an endpoint registered
+    # (including entry points, which are scanned if they haven't been yet)
+    def targets(self):
+        with self.lock:
+            self.scan_entry_points()
+            return list(self.specs)
+
+    # Takes in a target URL and returns True if an endpoint is registered for
+    # it (ignoring any query string). Entry points are only scanned if the
+    # target isn't already known
+    def __contains__(self, target):
+        target = target.split("?", 1)[0]
+        if (target in self.specs):
+            return True
+        with self.lock:
+            self.scan_entry_points()
+            return target in self.specs
+
+    # Takes in a target URL and returns the Endpoint responsible for it,
+    # importing and constructing it the first time it's asked for. Returns
+    # None if no endpoint is registered for the target
+    def lookup(self, target):
+        # ignore any query string when matching
+        target = target.split("?", 1)[0]
+        # fast path: the endpoint was already loaded
+        endpoint = self.endpoints.get(target)
+        if (endpoint != None):
+            return endpoint
+
+        with self.lock:
+            # another thread may have loaded it while we waited on the lock
+            endpoint = self.endpoints.get(target)
+            if (endpoint != None):
+                return endpoint
+            spec = self.specs.get(target)
+            if (spec == None):
+                self.scan_entry_points()
+                spec = self.specs.get(target)
+            if (spec == None):
+                return None
+            self.vprint("Loading endpoint for %s" % target)
+            endpoint = self.load(spec)(self.verbose)
+            self.endpoints[target] = endpoint
+            return endpoint
+
+    # Takes in a spec and imports the Endpoint class it refers to
+    def load(self, spec):
+        # entry points know how to load themselves
+        if (not isinstance(spec, str)):
+            return spec.load()
+        # otherwise, the spec should look like "module:Class"
+        (module_name, sep, class_name) = spec.partition(":")
+        if (not sep):
+            raise ValueError("Bad endpoint spec (expected module:Class): %s"
+                             % spec)
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)
+
+    # ------------------------- Utility Functions --------------------------- #
+    # Prints the string only if self.verbose is True
+    def vprint(self, msg):
+        if (self.verbose):
+            print("Endpoint Registry: %s" % msg)
+
+
+# ======================= Static File Serving Endpoint ====================== #
+# A simple static-file-serving endpoint. Defines a server root and serves
+def FileEndpoint(Endpoint):
+    def __init__(self, verbose):
+        # call the parent constructor
+        super().__init__(verbose)
+        # modify the target
+        self.target = "/gimme"
@@ -36,7 +36,6 @@ class HTTPRequest:
             pieces = string.split(" ", 3);
             # ensure the length is 4 - the three pieces of the top line, and
             # the remaining string of the message
-            print(str(pieces));
             if (len(pieces) != 4):
                 raise Exception("HTTP top-line parsing error.");
 
@@ -56,5 +55,3 @@ class HTTPRequest:
             string += "Target:\t" + self.uri;
             string += "Version:\t" + str(self.version);
 
-
-req = HTTPRequest("GET / HTTP/1.1\r\nUser-Agent: curl/7.29.0\r\nHost: cedar.rlogin:13650\r\nAccept: */*\r\n\r\n");
@@ -0,0 +1,307 @@
+# The portion of my web server responsible for parsing HTTP request messages
+# and putting together HTTP response messages
+#
+#   Connor Shugg
+#   June 2020
+
+# Library inclusions
+from enum import IntEnum
+import tempfile         # for spooling large request bodies to disk
+
+# Global variables
+BODY_CHUNK_SIZE = 8192                  # bytes read from a body per chunk
+BODY_SPOOL_THRESHOLD = 1024 * 1024      # bodies larger than this go to disk
+
+# ========================= HTTP Request Error Enum ========================= #
+# Stores various values corresponding to parse errors
+class HTTPParseError (IntEnum):
+    PARSE_ERROR = 1             # generic parsing error
+    BAD_METHOD = 2              # bad request method
+    BAD_TARGET = 3              # bad target URI
+    BAD_VERSION = 4             # bad HTTP/X.X version
+    REQUEST_TOO_LONG = 5        # the request was too long
+    BAD_LENGTH = 6              # bad Content-Length header (or short body)
+    BAD_ENCODING = 7            # unsupported Transfer-Encoding
+
+
+# =========================== HTTP Request Class ============================ #
+# A class that defines a single HTTP request message
+class HTTPRequest:
+    # Constructor: takes in the string making up the request message, and
+    # optionally the HTTPEnforcer to check it against (by default, one with
+    # the default rules)
+    def __init__(self, text, enforcer = None):
+        self.text = text
+        # initialize start line fields
+        self.method = None
+        self.target = None
+        self.version = None
+        # initialize headers
+        self.headers = {}
+        # initialize message body
+        self.body = None
+        # initialize a new enforcer object
+        self.enforcer = enforcer
+        if (self.enforcer == None):
+            self.enforcer = HTTPEnforcer()
+
+    # Takes the raw text and parses out the various HTTP fields. Returns 0 on
+    # success and a nonzero value on error
+    def parse(self):
+            # split text by "\r\n" as a delimeter
+            lines = self.text.split("\r\n")
+    
+            # take the first line and parse out the three fields. If there
+            # aren't three, there's nothing more we can do
+            start_fields = lines[0].split(" ")
+            if (len(start_fields) < 3):
+                return HTTPParseError.PARSE_ERROR
+            # request method
+            self.method = start_fields[0].strip()
+            err = self.enforcer.validate_method(self.method)   # error check
+            if (err):
+                return err
+
+            # request target
+            self.target = start_fields[1].strip()
+            err = self.enforcer.validate_target(self.target)   # error check
+            if (err):
+                return err
+            
+            # request version
+            self.version = start_fields[2].strip()
+            self.version = self.version.replace("HTTP/", "")
+            # validate the remaining string before parsing as a float
+            err = self.enforcer.validate_version(self.version)  # error check
+            if (err):
+                return err
+            # parse version as a float
+            self.version = float(self.version)
+            
+            # iterate through the remaining lines to pick out headers
+            lines = lines[1:]
+            index = 0
+            while (index < len(lines)):
+                # if the current line empty, we've gone past the headers
+                if (lines[index] == ""):
+                    break
+
+                # check to see if we've exceeded the header limit
+                if (index >= self.enforcer.header_limit):
+                    return HTTPParseError.REQUEST_TOO_LONG
+                
+                # split the line by the first ": " - if there aren't TWO
+                # resulting strings, skip this header
+                header = lines[index].split(": ", 1)
+                if (len(header) < 2):
+                    index += 1
+                    continue
+                # otherwise, add this header to the header dictionary
+                else:
+                    header[0] = header[0].strip()
+                    header[1] = header[1].strip()
+                    self.headers[header[0]] = header[1]
+                
+                index += 1
+            
+            # at this point, 'index' should be set to the index of the first
+            # blank line. Anything past it is the start of the message body,
+            # which is handed off to a body stream rather than being glued
+            # together here
+            if (index < len(lines) - 1):
+                rest = "\r\n".join(lines[index + 1:])
+                if (rest != ""):
+                    err = self.attach_body(None, rest.encode("utf-8"))
+                    if (err):
+                        return err
+            
+            # the parsing was a success - return 0
+            return 0
+
+    # Takes in a header name and returns its value, or None if the request
+    # doesn't have it. Header names are matched case-insensitively
+    def get_header(self, name):
+        name = name.lower()
+        for key in self.headers:
+            if (key.lower() == name):
+                return self.headers[key]
+        return None
+
+    # Sets up self.body as a HTTPRequestBody stream. Takes in the SocketTalker
+    # the rest of the body can be read from (or None if the body is entirely
+    # contained in 'initial') and any body bytes that were already read in
+    # along with the headers. Returns 0 on success and a HTTPParseError on
+    # error
+    def attach_body(self, talker, initial=b""):
+        # chunked (or any other) transfer encoding isn't implemented, so there
+        # is no way to tell where the body ends - refuse the request
+        if (self.get_header("Transfer-Encoding") != None):
+            return HTTPParseError.BAD_ENCODING
+
+        # figure out how long the body is. Without a Content-Length (or a
+        # Transfer-Encoding, refused above) a request has no body, so anything
+        # after the headers belongs to whatever comes next, not to this request
+        length = 0
+        value = self.get_header("Content-Length")
+        if (value != None):
+            try:
+                length = int(value)
+            except ValueError:
+                return HTTPParseError.BAD_LENGTH
+            if (length < 0):
+                return HTTPParseError.BAD_LENGTH
+            # with no socket to read the rest from, the whole body has to be
+            # here already
+            if (talker == None and length > len(initial)):
+                return HTTPParseError.BAD_LENGTH
+
+        # no body at all: leave self.body as None
+        if (length == 0):
+            self.body = None
+            return 0
+
+        # check for "Expect: 100-continue" so the stream knows to tell the
+        # client to go ahead once the body is actually read
+        expect = self.get_header("Expect")
+        expect_continue = expect != None and expect.lower() == "100-continue"
+        self.body = HTTPRequestBody(talker, length, initial, expect_continue)
+        return 0
+
+
+
+# ========================= HTTP Request Body Class ========================= #
+# A class that represents a request's message body as a stream. Rather than
+# reading the whole body into memory up front, endpoints pull it in chunks as
+# they need it. If the whole body is wanted at once, spool() collects it into
+# a file object that only stays in memory up to BODY_SPOOL_THRESHOLD bytes
+# before rolling over to a temporary file on disk.
+class HTTPRequestBody:
+    # Constructor: takes in a SocketTalker to read from (or None), the length
+    # of the body (from Content-Length), any body bytes that were already read
+    # in with the headers, and whether or not the client sent an
+    # "Expect: 100-continue" header
+    def __init__(self, talker, length, initial=b"", expect_continue=False):
+        self.talker = talker
+        self.length = length
+        # never hold onto more than 'length' bytes of what was read in early
+        self.initial = initial[:length]
+        self.remaining = length - len(self.initial)
+        self.expect_continue = expect_continue
+        self.continue_sent = False
+        self.spooled = None
+
+    # A generator that yields the body in chunks of (at most) 'size' bytes.
+    # The stream can only be walked once; after that (or after a call to
+    # spool()), the chunks come from the spooled file instead
+    def chunks(self, size=BODY_CHUNK_SIZE):
+        # if the body was already spooled, read it back out of the file
+        if (self.spooled != None):
+            self.spooled.seek(0)
+            chunk = self.spooled.read(size)
+            while (chunk):
+                yield chunk
+                chunk = self.spooled.read(size)
+            return
+
+        # first, hand over anything read in alongside the headers
+        while (len(self.initial) > 0):
+            chunk = self.initial[:size]
+            self.initial = self.initial[size:]
+            yield chunk
+
+        # then read the rest from the socket, one chunk at a time
+        while (self.remaining > 0 and self.talker != None):
+            self.send_continue()
+            chunk = self.talker.read(min(size, self.remaining))
+            # if the client closed the socket, the body is cut short
+            if (chunk == None):
+                self.remaining = 0
+                return
+            self.remaining -= len(chunk)
+            yield chunk
+
+    # Reads the (rest of the) body into a file object and returns it, seeked
+    # to the beginning. Small bodies stay in memory; anything larger than
+    # BODY_SPOOL_THRESHOLD is written out to a temporary file
+    def spool(self):
+        if (self.spooled != None):
+            self.spooled.seek(0)
+            return self.spooled
+
+        spooled = tempfile.SpooledTemporaryFile(max_size=BODY_SPOOL_THRESHOLD)
+        for chunk in self.chunks():
+            spooled.write(chunk)
+        spooled.seek(0)
+        self.spooled = spooled
+        return spooled
+
+    # Reads the whole body and returns it as bytes. Only meant for bodies that
+    # are known to be small; use chunks() or spool() otherwise
+    def read(self):
+        return self.spool().read()
+
+    # Closes the spooled file, if there is one (this removes it from disk)
+    def close(self):
+        if (self.spooled != None):
+            self.spooled.close()
+            self.spooled = None
+
+    # If the client asked for it, sends the interim "100 Continue" response
+    # telling the client to go ahead and send the body. This happens the first
+    # time the body is read from the socket, so a request that gets rejected
+    # without its body being read never has it sent
+    def send_continue(self):
+        if (self.expect_continue and not self.continue_sent):
+            self.talker.write("HTTP/1.1 100 Continue\r\n\r\n")
+            self.continue_sent = True
+
+
+
+# ========================== HTTP Enforcer Class ============================ #
+# A class used to define and enforce rules HTTP requests into the server must
+# follow, such as specific methods, specific URLs, etc.
+class HTTPEnforcer:
+    # Constructor: creates a HTTP enforcer with default rules. Takes in an
+    # optional collection of extra targets to allow on top of the defaults
+    # (such as the EndpointRegistry, which only has to support 'in')
+    def __init__(self, targets = None):
+        self.header_limit = 64      # the maximum number of allowed headers
+        # TODO: Instead of using hardcoded arrays, add in config files
+        self.allowed_methods = ["GET", "POST"]
+        self.allowed_targets = ["/", "/ifttt"]
+        self.allowed_versions = [1.1]
+        self.extra_targets = targets
+    
+    # Takes in a HTTP method and checks to see if it's allowed. Returns a 0
+    # on success, and a HTTPParseError on error
+    def validate_method(self, method):
+        if (method in self.allowed_methods):
+            return 0
+        else:
+            return HTTPParseError.BAD_METHOD
+    
+    # Takes in a HTTP target URI and checks to see if it's allowed (ignoring
+    # any query string). Returns a 0 on success, and a HTTPParseError on error
+    def validate_target(self, target):
+        target = target.split("?", 1)[0]
+        if (target in self.allowed_targets or
+            (self.extra_targets != None and target in self.extra_targets)):
+            return 0
+        else:
+            return HTTPParseError.BAD_TARGET
+    
+    # Takes in a halfway-parsed HTTP version number (should look like "1.1")
+    # and determines 1) if it can be parsed, and 2) if the version is accepted
+    # by the web server. Returns a 0 on success, and a HTTPParseError on error
+    def validate_version(self, version):
+        # attempt to convert to an integer
+        try:
+            version = float(version)
+        except:
+            return HTTPParseError.BAD_VERSION
+        # if the above worked, ensure the version is allowed
+        if (version in self.allowed_versions):
+            return 0
+        else:
+            return HTTPParseError.BAD_VERSION
+
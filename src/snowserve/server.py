@@ -0,0 +1,429 @@
+# A python program that works with the other programs in this directory to
+# listen in on an IPv4 and IPv6 socket to accept client connections
+#
+#   Connor Shugg
+#   May 2020
+
+# Library inclusions
+import sys              # for command-line arguments
+import getopt           # for command-line argument parsing
+import threading        # for multithreading
+import json             # for config files
+import multiprocessing  # for worker processes
+from signal import signal, SIGINT, SIG_IGN  # for signal handling
+from time import sleep, perf_counter    # for testing and startup timing
+
+# Module inclusions
+from .sockets import SocketListener, FakeConnection
+from .clients import ClientThread
+from .endpoints import EndpointRegistry
+from .stats import SharedStats, stats_name
+
+# Global variables
+CLIENT_THREAD_LIMIT = 5;
+client_spawn_semaphore = threading.Semaphore();
+
+
+# ============================== Server Class =============================== #
+# The main server class
+class Server:
+    # Constructor: takes in a verbose option and a port to bind to, as well as
+    # two integers: the number of accepter threads for IPv4, and the number of
+    # accepter threads for IPv6. These are set to 1 by default. An
+    # EndpointRegistry and a start time (from time.perf_counter(), used to
+    # report startup latency) can also be given, along with the number of
+    # worker processes to run and a per-IP rate limit (requests per second,
+    # and the size of the burst allowed above it; a rate of 0 turns rate
+    # limiting off). Nothing is bound or spawned until start() is called
+    def __init__(self, v, p, na4 = 1, na6 = 1, registry = None,
+                 start_time = None, workers = 1, rate_limit = 0,
+                 rate_burst = 10):
+        # set up the class fields
+        self.verbose = v
+        self.port = p
+        self.registry = registry
+        if (self.registry == None):
+            self.registry = EndpointRegistry(self.verbose)
+
+        # set up startup timing fields
+        self.start_time = start_time
+        if (self.start_time == None):
+            self.start_time = perf_counter()
+        self.first_accept_time = None
+        self.first_accept_lock = threading.Lock()
+        
+        # set up variables for the accepter threads
+        self.accepters4 = [None] * na4
+        self.accepters6 = [None] * na6
+        self.listener4 = None
+        self.listener6 = None
+
+        # set up variables for worker processes and shared state. The shared
+        # stats region holds the counters and rate-limit buckets, so every
+        # worker (and snowserve-stat) sees the same numbers
+        self.workers = workers
+        self.rate_limit = rate_limit
+        self.rate_burst = rate_burst
+        self.stats = None
+
+    # Binds the listener sockets and creates the shared stats region, if that
+    # hasn't been done already
+    def listen(self):
+        # create a new SocketListener for both IPv4 and IPv6 (as long as we
+        # have at least 1 listener thread for each). If port 0 was asked for,
+        # the first listener's port is used for the second, and from then on
+        # self.port is the port that was actually bound
+        if (len(self.accepters4) > 0 and self.listener4 == None):
+            self.listener4 = SocketListener(self.verbose, self.port, 4)
+            self.port = self.listener4.port
+        if (len(self.accepters6) > 0 and self.listener6 == None):
+            self.listener6 = SocketListener(self.verbose, self.port, 6)
+            self.port = self.listener6.port
+        # with the port bound, set up the stats region named after it
+        if (self.stats == None):
+            # if another live server already has the region, give the
+            # port back before passing the error along
+            try:
+                self.stats = SharedStats(self.verbose, stats_name(self.port),
+                                         True, self.workers)
+            except FileExistsError:
+                for listener in (self.listener4, self.listener6):
+                    if (listener != None):
+                        listener.close()
+                self.listener4 = None
+                self.listener6 = None
+                raise
+
+    # Binds the listener sockets and spawns the accepter threads
+    def start(self):
+        self.listen()
+        # spawn the accepter threads
+        self.accepters_spawn()
+        self.vprint("Listening %.1f ms after startup." %
+                    ((perf_counter() - self.start_time) * 1000.0))
+    
+    
+    # --------------------- Accepter Thread Management ---------------------- #
+    # Spawns two accepter threads - one that listens in on IPv4, and another
+    # that listens in on IPv6
+    def accepters_spawn(self):
+        # spawn the ipv4 accepters
+        for i in range(len(self.accepters4)):
+            # initialize the thread object and spin it up
+            self.accepters4[i] = ListenerThread(self.verbose, self.listener4, i, 4, self)
+            self.accepters4[i].start()
+
+        # spawn the ipv6 accepters
+        for i in range(len(self.accepters6)):
+            tid = i + len(self.accepters4)
+            # initialize the thread object and spin it up
+            self.accepters6[i] = ListenerThread(self.verbose, self.listener6, tid, 6, self)
+            self.accepters6[i].start()
+    
+    # Toggles all the accepter threads' kill switches and joins them
+    def accepters_kill(self):
+        # skip any accepters that were never spawned
+        accepters = [a for a in self.accepters4 + self.accepters6 if a != None]
+
+        # toggle all kill switches
+        for accepter in accepters:
+            accepter.trigger_kill()
+
+        # join all threads
+        for accepter in accepters:
+            accepter.join()
+
+    # Shuts the server down: stops the accepter threads, closes the listener
+    # sockets, and closes the stats region (removing it, if this process
+    # created it). Client threads still finishing up keep going; their stats
+    # updates are dropped once the region is closed
+    def stop(self):
+        self.accepters_kill()
+        if (self.listener4 != None):
+            self.listener4.close()
+        if (self.listener6 != None):
+            self.listener6.close()
+        if (self.stats != None):
+            self.stats.close()
+
+
+    # ----------------------- Worker Process Management --------------------- #
+    # Binds the listener sockets, then forks off self.workers processes that
+    # each run their own accepter threads on the shared sockets. Blocks until
+    # every worker has exited (on Ctrl+C, which every worker receives), then
+    # removes the shared stats region
+    def serve_workers(self):
+        self.listen()
+        ctx = multiprocessing.get_context("fork")
+        procs = []
+        for w in range(self.workers):
+            proc = ctx.Process(target=self.worker_main, args=(w,))
+            proc.start()
+            procs.append(proc)
+        self.vprint("Spawned %d worker processes." % len(procs))
+
+        # the workers handle Ctrl+C themselves; just wait for them
+        signal(SIGINT, SIG_IGN)
+        for proc in procs:
+            proc.join()
+        self.stats.close()
+
+    # The main function run by each worker process. Takes in the worker's
+    # index, which picks the row of counters it writes to
+    def worker_main(self, w):
+        self.stats.set_worker(w)
+        signal(SIGINT, self.sigint_handler)
+        self.accepters_spawn()
+        # wait here so the Ctrl+C handler has a thread to run on
+        for accepter in self.accepters4 + self.accepters6:
+            accepter.join()
+
+    # Called by the accepter threads whenever a client is accepted. The first
+    # time around, the time between startup and this first accepted
+    # connection is recorded and reported
+    def note_accept(self):
+        # fast path: the first connection has already been reported
+        if (self.first_accept_time != None):
+            return
+        with self.first_accept_lock:
+            if (self.first_accept_time != None):
+                return
+            self.first_accept_time = perf_counter()
+            print("First connection accepted %.1f ms after startup." %
+                  ((self.first_accept_time - self.start_time) * 1000.0))
+
+    # Takes in an accepted client socket and decides whether or not to serve
+    # it, based on the per-IP rate limit. Returns True if the client should be
+    # served
+    def admit(self, csock):
+        if (self.rate_limit <= 0):
+            return True
+        try:
+            addr = csock.getpeername()[0]
+        except OSError:
+            return False
+        return self.stats.take_token(addr, self.rate_limit, self.rate_burst)
+
+
+    # -------------------------- Utility Functions -------------------------- #
+    # Prints the string only if self.verbose is True
+    def vprint(self, msg):
+        if (self.verbose):
+            print(msg)
+    
+    # A handler for Ctrl+C that asks the accepter threads to exit before
+    # shutting down
+    def sigint_handler(self, sig, frame):
+        print("SIGINT caught: closing down accepter threads...")
+        self.stop()
+        exit(0)
+
+
+
+
+# ========================== Listener Thread Class ========================== #
+# A class that defines a thread tasked with listening on a given socket for
+# client connections
+class ListenerThread (threading.Thread):
+    # Constructor: takes in a verbose setting, a socket to listen on, a thread
+    # id, an 'address type' - either 4 or 6, and the Server that owns it
+    def __init__(self, v, l, t, at, server):
+        # call parent constructor
+        threading.Thread.__init__(self, target=self.listen)
+
+        # set up the class fields
+        self.verbose = v
+        self.listener = l
+        self.tid = t
+        self.addrtype = at
+        self.server = server
+        self.kill = False
+
+        # set up a flag to use to tell when the thread has exited
+        self.has_exited = False
+
+    # The main function listener threads run
+    def listen(self):
+        self.vprint("Spawned.")
+        # iterate until the kill switch is toggled
+        while (not self.kill):
+            self.vprint("Waiting for next client...")
+            csock = self.listener.accept()
+            self.server.note_accept()
+            stats = self.server.stats
+            stats.increment("connections_opened")
+
+            # turn away clients that are over their rate limit without
+            # spending a thread on them
+            if (not self.server.admit(csock)):
+                self.vprint("Rate-limiting client.")
+                stats.increment("rate_limited")
+                try:
+                    csock.sendall(b"HTTP/1.1 429 Too Many Requests\r\n\r\n")
+                except OSError:
+                    pass
+                csock.close()
+                stats.increment("connections_closed")
+                continue
+
+            # spawn a new thread to handle the client connection
+            cthread = ClientThread(self.verbose, csock, 5,
+                                   self.server.registry, stats)
+            cthread.start()
+
+        self.vprint("Exiting.")
+        return
+
+    # Helper function that sets the kill flag and makes an artificial connection
+    # with the blocked socket
+    def trigger_kill(self):
+        self.vprint("Setting thread kill switch...")
+        self.kill = True
+        # fake a connection to force the thread to exit
+        while (self.is_alive()):
+            self.vprint("Opening fake connection to trigger shutdown...")
+            fconn = FakeConnection(self.listener)
+            fconn.trigger()
+            # sleep for a short time to give the thread time to exit
+            sleep(0.25)
+    
+    # -------------------------- Utility Functions -------------------------- #
+    # Prints the string only if self.verbose is True
+    def vprint(self, msg):
+        if (self.verbose):
+            print("Accepter [ID %d] (IPv%d) %s" % (self.tid, self.addrtype, msg))
+
+
+
+
+# ============================ Server Creation ============================== #
+# Default configuration values. A config is a dictionary with any of these keys:
+#       verbose         Turns the server's verbose mode on
+#       port            The port to bind sockets to
+#       accepters4      The number of IPv4 accepter threads
+#       accepters6      The number of IPv6 accepter threads
+#       endpoints       A dictionary of target URL --> "module:Class" strings
+#       entry_points    Whether to pick up endpoints registered by installed
+#                       packages under the "snowserve.endpoints" group. The
+#                       packages are only scanned once a request comes in
+#                       for a target that isn't in 'endpoints'
+#       start_time      A time.perf_counter() value to measure startup from
+#       workers         The number of worker processes to run
+#       rate_limit      Requests per second allowed from each IP (0 = no limit)
+#       rate_burst      How many requests an IP can make at once, above the
+#                       rate limit
+DEFAULT_CONFIG = {
+    "verbose": False,
+    "port": 8080,
+    "accepters4": 1,
+    "accepters6": 1,
+    "endpoints": {},
+    "entry_points": True,
+    "start_time": None,
+    "workers": 1,
+    "rate_limit": 0,
+    "rate_burst": 10
+}
+
+# Takes in a config dictionary (see DEFAULT_CONFIG) and returns a new Server
+# that's ready to go, but hasn't been started yet. Endpoints are only
+# registered here; they're imported the first time a request needs them
+def create_server(config = None):
+    c = dict(DEFAULT_CONFIG)
+    if (config != None):
+        c.update(config)
+
+    # set up the endpoint registry
+    registry = EndpointRegistry(c["verbose"])
+    if (c["entry_points"]):
+        registry.load_entry_points()
+    for target in c["endpoints"]:
+        registry.register(target, c["endpoints"][target])
+
+    return Server(c["verbose"], c["port"], c["accepters4"], c["accepters6"],
+                  registry, c["start_time"], c["workers"], c["rate_limit"],
+                  c["rate_burst"])
+
+
+# ======================== Main Invocation/Arguments ======================== #
+# Parses command-line arguments and gets everything else going by creating and
+# starting a new Server. Takes in an optional start time (from
+# time.perf_counter()) to measure startup latency from
+def main(start_time = None):
+    config = {"start_time": start_time}
+
+    # attempt to extract arguments
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hvp:a:c:w:r:",
+                     ["help", "verbose", "port=", "accepters=", "config=",
+                      "workers=", "rate-limit="])
+    # if it fails, print the usage menu and exit
+    except getopt.GetoptError:
+        usage()
+        sys.exit(0)
+
+    # handle each argument one at a time
+    for opt, arg in opts:
+        if (opt in ("-h", "--help")):           # -h (--help)
+            usage()
+            sys.exit(0)
+        elif (opt in ("-v", "--verbose")):      # -v (--verbose)
+            config["verbose"] = True
+        elif (opt in ("-p", "--port")):         # -p (--port)
+            config["port"] = int(arg)
+        elif (opt in ("-a", "--accepters")):    # -a (--accepters)
+            try:
+                threadCounts = arg.split(",")
+                config["accepters4"] = int(threadCounts[0])
+                config["accepters6"] = int(threadCounts[1])
+            except:
+                usage()
+                sys.exit(0)
+        elif (opt in ("-w", "--workers")):      # -w (--workers)
+            config["workers"] = int(arg)
+        elif (opt in ("-r", "--rate-limit")):   # -r (--rate-limit)
+            config["rate_limit"] = float(arg)
+        elif (opt in ("-c", "--config")):       # -c (--config)
+            # values given on the command line win over the config file
+            try:
+                with open(arg, "r") as f:
+                    config = dict(json.load(f), **config)
+            except (OSError, ValueError) as e:
+                print("Error: could not load config file %s:\n%s" % (arg, str(e)))
+                sys.exit(1)
+            
+        else:                                   # (default)
+            usage()
+            sys.exit(0)
+    
+    # set up the new server. With more than one worker, hand things off to
+    # the worker processes; otherwise, register a signal handler and start
+    # it up in this process
+    s = create_server(config)
+    try:
+        if (s.workers > 1):
+            s.serve_workers()
+        else:
+            signal(SIGINT, s.sigint_handler)
+            s.start()
+    except FileExistsError as e:
+        print("Error: %s" % str(e))
+        sys.exit(1)
+
+    # return the server
+    return s
+
+
+# Usage/help menu function. Prints out a menu that explains to the user how
+# to invoke the program
+def usage():
+    print("\nInvocation Arguments:")
+    print("---------------------------------------------------------------------------------------------")
+    print(" -h (--help)                             Prints this help menu")
+    print(" -v (--verbose)                          Turns the server's verbose mode on")
+    print(" -p <p> (--port=<p>)                     Binds sockets to the given port")
+    print(" -a <n4>,<n6> (--accepters=<n4>,<n6>)    Runs the server with <n4> and <n6> accepter threads")
+    print(" -c <file> (--config=<file>)             Loads server settings from a JSON config file")
+    print(" -w <n> (--workers=<n>)                  Runs the server in <n> worker processes")
+    print(" -r <n> (--rate-limit=<n>)               Allows each IP <n> requests per second")
+    print("---------------------------------------------------------------------------------------------\n")
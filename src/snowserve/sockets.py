@@ -46,6 +46,9 @@ class SocketListener:
             self.socket.bind(chosen_address)
             break
 
+        # if port 0 was asked for, the OS picked one: remember which
+        self.port = self.socket.getsockname()[1]
+
         # set the socket to listen
         self.socket.listen(5)
         
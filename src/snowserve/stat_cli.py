@@ -0,0 +1,84 @@
+# The "snowserve-stat" command: attaches to a running server's shared stats
+# region and prints out its counters. Nothing here takes a lock, so reading
+# the stats never slows the server down.
+#
+#   Connor Shugg
+
+# Library inclusions
+import sys              # for command-line arguments
+import getopt           # for command-line argument parsing
+
+# Module inclusions
+from .stats import SharedStats, stats_name, COUNTERS
+
+
+# ======================== Main Invocation/Arguments ======================== #
+# Parses command-line arguments, attaches to the stats region, and prints out
+# its counters
+def main():
+    port = 8080
+    name = None
+    per_worker = False
+
+    # attempt to extract arguments
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hp:n:w",
+                     ["help", "port=", "name=", "workers"])
+    # if it fails, print the usage menu and exit
+    except getopt.GetoptError:
+        usage()
+        sys.exit(0)
+
+    # handle each argument one at a time
+    for opt, arg in opts:
+        if (opt in ("-h", "--help")):           # -h (--help)
+            usage()
+            sys.exit(0)
+        elif (opt in ("-p", "--port")):         # -p (--port)
+            port = int(arg)
+        elif (opt in ("-n", "--name")):         # -n (--name)
+            name = arg
+        elif (opt in ("-w", "--workers")):      # -w (--workers)
+            per_worker = True
+        else:                                   # (default)
+            usage()
+            sys.exit(0)
+    if (name == None):
+        name = stats_name(port)
+
+    # attach to the region (read-only use; nothing here takes a lock)
+    try:
+        stats = SharedStats(False, name)
+    except (FileNotFoundError, ValueError) as e:
+        print("Error: could not open stats region %s: %s" % (name, str(e)))
+        sys.exit(1)
+
+    print("%-24s %d" % ("server_pid", stats.pid))
+    snap = stats.snapshot()
+    for key in snap:
+        print("%-24s %d" % (key, snap[key]))
+    print("%-24s %d/%d" % ("rate_limit_buckets", stats.table_usage(),
+                           stats.slots))
+    # optionally, break the counters down by worker
+    if (per_worker):
+        for w in range(stats.workers):
+            print("\nWorker %d:" % w)
+            for key in COUNTERS:
+                print("    %-20s %d" % (key, stats.read(key, w)))
+    stats.close()
+
+
+# Usage/help menu function. Prints out a menu that explains to the user how
+# to invoke the program
+def usage():
+    print("\nInvocation Arguments:")
+    print("---------------------------------------------------------------------------------------------")
+    print(" -h (--help)                             Prints this help menu")
+    print(" -p <p> (--port=<p>)                     Reads the stats of the server bound to the given port")
+    print(" -n <name> (--name=<name>)               Reads the stats region with the given name")
+    print(" -w (--workers)                          Also prints each worker's counters")
+    print("---------------------------------------------------------------------------------------------\n")
+
+
+if (__name__ == "__main__"):
+    main()
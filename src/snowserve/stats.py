@@ -0,0 +1,312 @@
+# The portion of my web server responsible for keeping track of server-wide
+# state that every worker process needs to see: counters (connections,
+# requests, errors) and per-IP rate-limit buckets. Everything lives in a
+# single multiprocessing.shared_memory region, so it can also be read from
+# outside the server (see stat_cli.py and snowserve-stat).
+#
+# Helpful documentation:
+# https://docs.python.org/3/library/multiprocessing.shared_memory.html
+#
+#   Connor Shugg
+
+# Library inclusions
+import os               # for checking whether a region's creator is alive
+import struct           # for packing values into the shared region
+import threading        # for guarding updates within a single process
+import hashlib          # for hashing rate-limit keys the same in every process
+from time import monotonic      # for rate-limit token refills
+from multiprocessing import shared_memory, resource_tracker
+
+# Global variables
+STATS_MAGIC = b"SNOW"
+STATS_VERSION = 2
+# header: magic, version, number of worker rows, number of counters, number
+# of hash table slots, and the PID of the process that created the region
+# (padded out to 32 bytes)
+HEADER_FORMAT = "<4sIIIIQ4x"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+# the counters each worker keeps. Each worker only ever writes to its own
+# row of counters; readers add up every row
+COUNTERS = ["connections_opened", "connections_closed", "requests",
+            "parse_errors", "rate_limited"]
+COUNTER_FORMAT = "<Q"
+COUNTER_SIZE = struct.calcsize(COUNTER_FORMAT)
+# a hash table slot: key hash (0 = empty), key, tokens left, last refill time
+SLOT_FORMAT = "<Q48sdd"
+SLOT_SIZE = struct.calcsize(SLOT_FORMAT)
+SLOT_PROBE_LIMIT = 16   # the most slots looked at when finding a key
+DEFAULT_SLOTS = 4096
+# names of the regions this process created (see SharedStats.attach())
+created_regions = set()
+
+
+# Takes in a PID and returns True if a process with that PID is running
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # it exists, it just isn't ours
+        return True
+    return True
+
+
+# Takes in a port number and returns the name of the shared memory region a
+# server bound to that port uses. This should be the port the server actually
+# bound, not the one asked for (which may be 0)
+def stats_name(port):
+    return "snowserve_%d" % port
+
+
+# ============================ Shared Stats Class =========================== #
+# A class that lays out counters and a fixed-size hash table in a shared
+# memory region.
+#
+# There's no cross-process locking anywhere: counters are split into one row
+# per worker so that each 8-byte value only ever has one process writing it,
+# and readers just add the rows up. The rate-limit table is shared by every
+# worker, so two workers updating the same bucket at the same moment can
+# lose an update - rate limits are approximate ("atomic-ish") rather than
+# exact. Within a process, a plain threading lock keeps client threads from
+# stepping on each other.
+class SharedStats:
+    # Constructor: takes in a verbose switch, the region's name, and whether
+    # to create the region (the server) or attach to an existing one (workers
+    # and the stat CLI). When creating, the number of worker rows and hash
+    # table slots must be given
+    def __init__(self, v, name, create = False, workers = 1,
+                 slots = DEFAULT_SLOTS):
+        self.verbose = v
+        self.name = name
+        self.worker = 0
+        self.lock = threading.Lock()
+        self.closed = False
+
+        if (create):
+            self.create(workers, slots)
+        else:
+            self.attach()
+
+        # compute where each section of the region starts
+        self.counters_offset = HEADER_SIZE
+        self.table_offset = self.counters_offset + \
+                            self.workers * len(COUNTERS) * COUNTER_SIZE
+
+
+    # ----------------------- Region Setup/Teardown ------------------------- #
+    # Creates a fresh, zeroed region and writes its header
+    def create(self, workers, slots):
+        self.workers = workers
+        self.slots = slots
+        size = HEADER_SIZE + workers * len(COUNTERS) * COUNTER_SIZE + \
+               slots * SLOT_SIZE
+        try:
+            self.shm = shared_memory.SharedMemory(self.name, True, size)
+        except FileExistsError:
+            # the region already exists. Being able to bind the port doesn't
+            # prove it's unused (an IPv4-only and an IPv6-only server can
+            # share a port number), so only replace it if it was left behind
+            # by a server that's no longer running
+            self.replace_stale()
+            self.shm = shared_memory.SharedMemory(self.name, True, size)
+        self.owner = True
+        created_regions.add(self.name)
+        self.pid = os.getpid()
+
+        # zero everything out, then write the header
+        self.shm.buf[:size] = bytes(size)
+        struct.pack_into(HEADER_FORMAT, self.shm.buf, 0, STATS_MAGIC,
+                         STATS_VERSION, workers, len(COUNTERS), slots,
+                         self.pid)
+        self.vprint("Created shared memory region %s (%d bytes)" %
+                    (self.name, size))
+
+    # Removes an existing region with this name, as long as it's a snowserve
+    # region whose creator is no longer running. Raises a FileExistsError
+    # otherwise
+    def replace_stale(self):
+        stale = shared_memory.SharedMemory(self.name)
+        magic = bytes(stale.buf[:4])
+        version = 0
+        pid = 0
+        if (len(stale.buf) >= HEADER_SIZE):
+            (magic, version, w, c, s, pid) = \
+                struct.unpack_from(HEADER_FORMAT, stale.buf, 0)
+
+        # refuse to touch anything that isn't ours, or that's still in use.
+        # (Older layouts didn't record a PID; those are always stale)
+        reason = None
+        if (magic != STATS_MAGIC):
+            reason = "is not a snowserve stats region"
+        elif (version == STATS_VERSION and pid_alive(pid)):
+            reason = "is in use by process %d" % pid
+        if (reason != None):
+            # opening the region registered it with the resource tracker,
+            # which would remove it out from under its owner when this
+            # process exits (see attach())
+            if (self.name not in created_regions):
+                resource_tracker.unregister(stale._name, "shared_memory")
+            stale.close()
+            raise FileExistsError("Shared memory region %s %s" %
+                                  (self.name, reason))
+
+        self.vprint("Replacing stale shared memory region %s" % self.name)
+        stale.close()
+        stale.unlink()
+
+    # Attaches to an existing region and reads its layout from the header
+    def attach(self):
+        self.shm = shared_memory.SharedMemory(self.name)
+        # before Python 3.13, attaching registers the region with the resource
+        # tracker, which would unlink it out from under the server when this
+        # process exits. If this process created the region, the tracker
+        # should keep knowing about it
+        if (self.name not in created_regions):
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.owner = False
+
+        (magic, version, self.workers, ncounters, self.slots, self.pid) = \
+            struct.unpack_from(HEADER_FORMAT, self.shm.buf, 0)
+        if (magic != STATS_MAGIC or version != STATS_VERSION or
+            ncounters != len(COUNTERS)):
+            self.shm.close()
+            raise ValueError("%s is not a snowserve stats region" % self.name)
+
+    # Closes this process's view of the region. If this process created it,
+    # the region is also removed. Client threads may still be holding onto
+    # this object, so once it's closed, updates are quietly dropped
+    def close(self):
+        with self.lock:
+            if (self.closed):
+                return
+            self.closed = True
+            self.shm.close()
+            if (self.owner):
+                self.shm.unlink()
+                created_regions.discard(self.name)
+                self.vprint("Removed shared memory region %s" % self.name)
+
+    # Takes in a worker index (0 to workers - 1) and sets the row of counters
+    # this process writes to
+    def set_worker(self, worker):
+        self.worker = worker
+        # a forked worker inherits the region, but shouldn't remove it
+        self.owner = False
+
+
+    # ------------------------------ Counters ------------------------------- #
+    # Takes in a counter index and a worker index and returns the offset of
+    # that worker's copy of the counter
+    def counter_offset(self, counter, worker):
+        return self.counters_offset + \
+               (worker * len(COUNTERS) + counter) * COUNTER_SIZE
+
+    # Takes in a counter name and adds 'n' to this worker's copy of it. Does
+    # nothing if the region has been closed
+    def increment(self, name, n = 1):
+        offset = self.counter_offset(COUNTERS.index(name), self.worker)
+        with self.lock:
+            if (self.closed):
+                return
+            (value,) = struct.unpack_from(COUNTER_FORMAT, self.shm.buf, offset)
+            struct.pack_into(COUNTER_FORMAT, self.shm.buf, offset, value + n)
+
+    # Takes in a counter name and returns its value for a single worker, or
+    # the sum across every worker if no worker is given
+    def read(self, name, worker = None):
+        counter = COUNTERS.index(name)
+        workers = range(self.workers) if worker == None else [worker]
+        total = 0
+        for w in workers:
+            (value,) = struct.unpack_from(COUNTER_FORMAT, self.shm.buf,
+                                          self.counter_offset(counter, w))
+            total += value
+        return total
+
+    # Returns a dictionary of every counter's server-wide value, plus the
+    # number of currently open connections
+    def snapshot(self):
+        snap = {}
+        for name in COUNTERS:
+            snap[name] = self.read(name)
+        snap["connections_active"] = snap["connections_opened"] - \
+                                     snap["connections_closed"]
+        return snap
+
+
+    # -------------------------- Rate-Limit Table --------------------------- #
+    # Takes in a key string (a client IP address) and returns its hash. The
+    # hash is never 0, since 0 marks an empty slot
+    def key_hash(self, key):
+        digest = hashlib.blake2b(key, digest_size=8).digest()
+        return struct.unpack("<Q", digest)[0] | 1
+
+    # Takes in a slot index and returns its offset
+    def slot_offset(self, slot):
+        return self.table_offset + slot * SLOT_SIZE
+
+    # Takes in a key, a refill rate (tokens per second), and a burst size (the
+    # most tokens a bucket can hold) and tries to take one token from the key's
+    # bucket. Returns True if a token was taken (or the region has been
+    # closed), and False if the key is over its limit
+    def take_token(self, key, rate, burst):
+        key = key.encode("utf-8")[:48]
+        h = self.key_hash(key)
+        now = monotonic()
+        with self.lock:
+            if (self.closed):
+                return True
+            # probe a bounded number of slots for the key. If it isn't found,
+            # take the first empty slot, or else evict whichever bucket was
+            # touched longest ago
+            start = h % self.slots
+            victim = None
+            victim_stamp = None
+            for i in range(SLOT_PROBE_LIMIT):
+                slot = (start + i) % self.slots
+                (sh, skey, tokens, stamp) = struct.unpack_from(
+                    SLOT_FORMAT, self.shm.buf, self.slot_offset(slot))
+                if (sh == h and skey.rstrip(b"\0") == key):
+                    victim = None
+                    break
+                if (sh == 0):
+                    victim = slot
+                    victim_stamp = -1.0
+                    break
+                if (victim_stamp == None or stamp < victim_stamp):
+                    victim = slot
+                    victim_stamp = stamp
+
+            # a new bucket starts out full
+            if (victim != None):
+                slot = victim
+                tokens = float(burst)
+                stamp = now
+
+            # refill the bucket for the time that's passed, then try to take
+            # a token out of it
+            tokens = min(float(burst), tokens + (now - stamp) * rate)
+            allowed = tokens >= 1.0
+            if (allowed):
+                tokens -= 1.0
+            struct.pack_into(SLOT_FORMAT, self.shm.buf, self.slot_offset(slot),
+                             h, key, tokens, now)
+            return allowed
+
+    # Returns the number of hash table slots currently in use
+    def table_usage(self):
+        used = 0
+        for slot in range(self.slots):
+            (sh,) = struct.unpack_from("<Q", self.shm.buf,
+                                       self.slot_offset(slot))
+            if (sh != 0):
+                used += 1
+        return used
+
+
+    # -------------------------- Utility Functions -------------------------- #
+    # Prints the string only if self.verbose is True
+    def vprint(self, msg):
+        if (self.verbose):
+            print("Stats [%s] %s" % (self.name, msg))
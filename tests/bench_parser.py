@@ -0,0 +1,131 @@
+# A small benchmark that measures HTTPRequest.parse() throughput for each
+# corpus in parser_corpus.py, so parser performance regressions show up when
+# the numbers are compared between runs. Given a baseline (a file written
+# with -o on an earlier run), it exits with status 1 if any corpus is more
+# than the tolerance slower than its most recent baseline result.
+#
+# Run with: python3 tests/bench_parser.py [-o <output file>]
+#                   [-b <baseline file>] [-t <tolerance percent>]
+#
+#   Connor Shugg
+
+# Library inclusions
+import os               # for path manipulation
+import sys              # for command-line arguments and the search path
+import getopt           # for command-line argument parsing
+from time import perf_counter   # for timing parses
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Module inclusions
+from parser_corpus import CORPORA
+from snowserve.http_messages import HTTPRequest
+
+# Global variables
+BENCH_SECONDS = 0.5     # roughly how long to spend on each corpus
+DEFAULT_TOLERANCE = 20.0    # how many percent slower than the baseline is ok
+USAGE = "Usage: %s [-o <output file>] [-b <baseline file>] " \
+        "[-t <tolerance percent>]"
+
+
+# Takes in a corpus and parses every request in it over and over for about
+# BENCH_SECONDS. Returns a tuple of (requests per second, megabytes per second)
+def bench(corpus):
+    texts = [entry[1] for entry in corpus]
+    size = sum(len(text) for text in texts)
+    passes = 0
+    start = perf_counter()
+    elapsed = 0.0
+    while (elapsed < BENCH_SECONDS):
+        for text in texts:
+            HTTPRequest(text).parse()
+        passes += 1
+        elapsed = perf_counter() - start
+    return ((passes * len(texts)) / elapsed,
+            (passes * size) / elapsed / (1024 * 1024))
+
+
+# Takes in the path to a file written with -o and returns a dictionary of
+# each corpus's most recent requests per second. Lines that don't look like
+# results are skipped
+def read_baseline(path):
+    baseline = {}
+    with open(path, "r") as f:
+        for line in f:
+            pieces = line.split()
+            if (len(pieces) < 5 or pieces[2] != "req/s"):
+                continue
+            try:
+                baseline[pieces[0]] = float(pieces[1])
+            except ValueError:
+                continue
+    return baseline
+
+
+def main():
+    output = None
+    baseline_path = None
+    tolerance = DEFAULT_TOLERANCE
+
+    # attempt to extract arguments
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "ho:b:t:",
+                                   ["help", "output=", "baseline=",
+                                    "tolerance="])
+    except getopt.GetoptError:
+        print(USAGE % sys.argv[0])
+        sys.exit(0)
+    for opt, arg in opts:
+        if (opt in ("-o", "--output")):
+            output = arg
+        elif (opt in ("-b", "--baseline")):
+            baseline_path = arg
+        elif (opt in ("-t", "--tolerance")):
+            try:
+                tolerance = float(arg)
+            except ValueError:
+                print("Error: the tolerance must be a number (of percent)")
+                sys.exit(1)
+        else:
+            print(USAGE % sys.argv[0])
+            sys.exit(0)
+
+    # read the baseline before running anything, since it may be the same
+    # file the results are about to be appended to
+    baseline = {}
+    if (baseline_path != None):
+        try:
+            baseline = read_baseline(baseline_path)
+        except OSError as e:
+            print("Error: couldn't read baseline %s: %s" %
+                  (baseline_path, str(e)))
+            sys.exit(1)
+
+    # run each corpus and report its throughput
+    lines = []
+    regressions = []
+    for name in CORPORA:
+        (rps, mbps) = bench(CORPORA[name])
+        lines.append("%-12s %12.0f req/s %10.2f MB/s" % (name, rps, mbps))
+        # compare against the baseline, if there is one for this corpus
+        if (name in baseline and baseline[name] > 0):
+            change = (rps - baseline[name]) / baseline[name] * 100.0
+            lines[-1] += " %+7.1f%%" % change
+            if (change < -tolerance):
+                regressions.append(name)
+        print(lines[-1])
+
+    # optionally, record the results so they can be compared later
+    if (output != None):
+        with open(output, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+    # fail if anything got slower than the tolerance allows
+    if (len(regressions) > 0):
+        print("Regression: %s more than %.1f%% slower than the baseline" %
+              (", ".join(regressions), tolerance))
+        sys.exit(1)
+
+
+if (__name__ == "__main__"):
+    main()
@@ -0,0 +1,44 @@
+# A small harness for running raw request bytes through a real ClientThread
+# over a socket pair, the same way the server handles an accepted client.
+#
+#   Connor Shugg
+
+# Library inclusions
+import os               # for path manipulation
+import sys              # for the module search path
+import socket           # for socket pairs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "src"))
+
+# Module inclusions
+from snowserve.clients import ClientThread
+
+# Global variables
+TIMEOUT = 5.0           # seconds to wait on the client thread
+
+
+# Takes in a registry (or None) and the raw request bytes, runs them through a
+# client thread, and returns everything the thread sent back before closing
+# the connection. Fails if the thread doesn't finish within TIMEOUT seconds.
+# A SharedStats can be given for the thread to count the request in
+def run_client(registry, request, stats = None):
+    (server_sock, client_sock) = socket.socketpair()
+    client_sock.settimeout(TIMEOUT)
+    thread = ClientThread(False, server_sock, 0, registry, stats)
+    thread.start()
+    client_sock.sendall(request)
+    # let the thread see the end of the request, like a client that's done
+    # sending
+    client_sock.shutdown(socket.SHUT_WR)
+
+    # read until the thread closes its end of the connection
+    response = b""
+    chunk = client_sock.recv(1024)
+    while (chunk):
+        response += chunk
+        chunk = client_sock.recv(1024)
+    client_sock.close()
+    thread.join(TIMEOUT)
+    assert not thread.is_alive(), "client thread did not exit"
+    return response
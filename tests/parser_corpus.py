@@ -0,0 +1,175 @@
+# A corpus of HTTP requests used to test and benchmark HTTPRequest.parse().
+# Every entry is deterministic (the "garbage" corpus comes from a seeded
+# random number generator), so results and timings can be compared from run
+# to run.
+#
+# Each corpus is a list of entries, which are tuples of:
+#       (name, request text, expected parse result, expected fields)
+# where the expected parse result is 0 or a HTTPParseError, and the expected
+# fields are a dictionary of HTTPRequest attributes to check (or None to only
+# check that parsing finishes).
+#
+#   Connor Shugg
+
+# Library inclusions
+import os               # for path manipulation
+import sys              # for the module search path
+import random           # for generating garbage requests
+
+# make the server package importable from the tests directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "src"))
+
+# Module inclusions
+from snowserve.http_messages import HTTPParseError
+
+# Global variables
+HEADER_LIMIT = 64       # HTTPEnforcer's default header limit
+GARBAGE_SEED = 1337     # seed for the garbage corpus
+GARBAGE_COUNT = 200     # the number of garbage requests to generate
+
+
+# Takes in a number of headers and returns a GET request with that many
+def many_headers(count):
+    lines = ["GET / HTTP/1.1"]
+    for i in range(count):
+        lines.append("X-Header-%d: %d" % (i, i))
+    return "\r\n".join(lines) + "\r\n\r\n"
+
+
+# ============================= Valid Requests ============================== #
+VALID = [
+    ("simple get",
+     "GET / HTTP/1.1\r\nHost: localhost\r\n\r\n",
+     0, {"method": "GET", "target": "/", "version": 1.1,
+         "headers": {"Host": "localhost"}, "body": None}),
+    ("curl get",
+     "GET / HTTP/1.1\r\nUser-Agent: curl/7.29.0\r\nHost: cedar.rlogin:13650\r\n"
+     "Accept: */*\r\n\r\n",
+     0, {"headers": {"User-Agent": "curl/7.29.0",
+                     "Host": "cedar.rlogin:13650", "Accept": "*/*"}}),
+    ("no headers",
+     "GET / HTTP/1.1\r\n\r\n",
+     0, {"headers": {}, "body": None}),
+    ("header value with ': '",
+     "GET /ifttt HTTP/1.1\r\nX-Note: a: b: c\r\n\r\n",
+     0, {"target": "/ifttt", "headers": {"X-Note": "a: b: c"}}),
+    ("post with body",
+     "POST / HTTP/1.1\r\nContent-Length: 11\r\n\r\nhello world",
+     0, {"method": "POST", "headers": {"Content-Length": "11"}}),
+    ("header limit exactly",
+     many_headers(HEADER_LIMIT),
+     0, {"method": "GET"}),
+]
+
+
+# =========================== Malformed Requests ============================ #
+MALFORMED = [
+    ("empty", "", HTTPParseError.PARSE_ERROR, None),
+    ("method only", "GET", HTTPParseError.PARSE_ERROR, None),
+    ("no version", "GET /\r\n\r\n", HTTPParseError.PARSE_ERROR, None),
+    ("bad method", "BREW / HTTP/1.1\r\n\r\n", HTTPParseError.BAD_METHOD, None),
+    ("bad target", "GET /etc/passwd HTTP/1.1\r\n\r\n",
+     HTTPParseError.BAD_TARGET, None),
+    ("bad version", "GET / HTTP/one\r\n\r\n", HTTPParseError.BAD_VERSION, None),
+    ("old version", "GET / HTTP/1.0\r\n\r\n", HTTPParseError.BAD_VERSION, None),
+    ("nan version", "GET / HTTP/nan\r\n\r\n", HTTPParseError.BAD_VERSION, None),
+    ("header without separator",
+     "GET / HTTP/1.1\r\nHost localhost\r\nAccept: */*\r\n\r\n",
+     0, {"headers": {"Accept": "*/*"}}),
+    ("bad content length",
+     "POST / HTTP/1.1\r\nContent-Length: lots\r\n\r\nbody",
+     HTTPParseError.BAD_LENGTH, None),
+    ("negative content length",
+     "POST / HTTP/1.1\r\nContent-Length: -5\r\n\r\nbody",
+     HTTPParseError.BAD_LENGTH, None),
+    ("body shorter than content length",
+     "POST / HTTP/1.1\r\nContent-Length: 100\r\n\r\nbody",
+     HTTPParseError.BAD_LENGTH, None),
+    ("chunked body",
+     "POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n4\r\nbody\r\n0\r\n\r\n",
+     HTTPParseError.BAD_ENCODING, None),
+    ("bare newlines", "GET / HTTP/1.1\nHost: localhost\n\n",
+     HTTPParseError.BAD_VERSION, None),
+]
+
+
+# ========================== Adversarial Requests =========================== #
+# Takes in a size and returns the adversarial corpus at that size. The
+# linear-time test builds this at a few sizes and compares parse times
+ADVERSARIAL_KINDS = ["many headers", "many separatorless headers",
+                     "long header value", "long start line", "long body",
+                     "many blank lines"]
+
+def adversarial(kind, n):
+    if (kind == "many headers"):
+        return many_headers(n)
+    if (kind == "many separatorless headers"):
+        return "GET / HTTP/1.1\r\n" + "NoColonHere\r\n" * n + "\r\n"
+    if (kind == "long header value"):
+        return "GET / HTTP/1.1\r\nX-Long: " + "a" * (n * 64) + "\r\n\r\n"
+    if (kind == "long start line"):
+        return "GET /" + "a" * (n * 64) + " HTTP/1.1\r\n\r\n"
+    if (kind == "long body"):
+        return "POST / HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (n * 48) + \
+               "b\r\n" * (n * 16)
+    if (kind == "many blank lines"):
+        return "GET / HTTP/1.1\r\n\r\n" + "\r\n" * n
+    raise ValueError("unknown adversarial kind: %s" % kind)
+
+ADVERSARIAL = [
+    ("header limit plus one", many_headers(HEADER_LIMIT + 1),
+     HTTPParseError.REQUEST_TOO_LONG, None),
+    ("many headers", adversarial("many headers", 10000),
+     HTTPParseError.REQUEST_TOO_LONG, None),
+    ("many separatorless headers",
+     adversarial("many separatorless headers", 10000),
+     HTTPParseError.REQUEST_TOO_LONG, None),
+    ("long header value", adversarial("long header value", 1000), 0, None),
+    ("long start line", adversarial("long start line", 1000),
+     HTTPParseError.BAD_TARGET, None),
+    ("long body", adversarial("long body", 1000), 0, None),
+    ("many blank lines", adversarial("many blank lines", 10000), 0,
+     {"body": None}),
+]
+
+
+# ============================ Garbage Requests ============================= #
+# Returns a list of (name, bytes) binary garbage requests. Some are pure
+# noise; others start with a valid start line so the garbage reaches the
+# header parsing
+def raw_garbage():
+    rng = random.Random(GARBAGE_SEED)
+    entries = []
+    for i in range(GARBAGE_COUNT):
+        data = bytes(rng.getrandbits(8) for j in range(rng.randint(0, 512)))
+        if (i % 2):
+            data = b"GET / HTTP/1.1\r\n" + data
+        entries.append(("garbage %d" % i, data))
+    return entries
+
+# Raw bytes, exactly as a client could send them. These are what the server's
+# own UTF-8 decode sees (see RAW_GARBAGE tests), so they include invalid UTF-8
+RAW_GARBAGE = raw_garbage() + [
+    ("invalid utf-8 start line", b"GET /\xff\xfe HTTP/1.1\r\n\r\n"),
+    ("invalid utf-8 header", b"GET / HTTP/1.1\r\nHost: \xc3\x28\r\n\r\n"),
+    ("truncated utf-8", b"GET / HTTP/1.1\r\nX-A: \xe2\x82\r\n\r\n"),
+    ("overlong utf-8", b"GET / HTTP/1.1\r\nX-A: \xc0\xaf\r\n\r\n"),
+    ("surrogate utf-8", b"GET / HTTP/1.1\r\nX-A: \xed\xa0\x80\r\n\r\n"),
+    ("nul bytes", b"GET / HTTP/1.1\r\nX-A: \x00\x00\r\n\r\n"),
+]
+
+# The same garbage decoded as latin-1, so every byte makes it into the string
+# given to parse(). This reaches the parser even for bytes the server's UTF-8
+# decode would have turned away
+GARBAGE = [(name, data.decode("latin-1"), None, None)
+           for (name, data) in RAW_GARBAGE]
+
+
+# Every corpus, by name
+CORPORA = {
+    "valid": VALID,
+    "malformed": MALFORMED,
+    "adversarial": ADVERSARIAL,
+    "garbage": GARBAGE,
+}
@@ -0,0 +1,28 @@
+# Endpoints used by the endpoint tests. They're referenced by "module:Class"
+# spec, the same way a server config would reference them.
+#
+#   Connor Shugg
+
+# Module inclusions
+from snowserve.endpoints import Endpoint
+
+
+# An endpoint that replies with its target and the size of the request body
+class EchoEndpoint(Endpoint):
+    def get_target(self):
+        return self.target
+
+    def assign(self, request):
+        size = 0
+        if (request.body != None):
+            size = sum(len(chunk) for chunk in request.body.chunks())
+        return "HTTP/1.1 200 OK\r\n\r\n%s %d" % (request.target, size)
+
+
+# An endpoint that always throws
+class BrokenEndpoint(Endpoint):
+    def get_target(self):
+        return self.target
+
+    def assign(self, request):
+        raise RuntimeError("this endpoint is broken")
@@ -0,0 +1,110 @@
+# Tests for handing requests to endpoints: registering endpoints on new
+# targets, loading them lazily, and surviving endpoints that throw. Requests
+# go through a real ClientThread over a socket pair.
+#
+# Run with: python3 -m pytest tests
+#
+#   Connor Shugg
+
+# Library inclusions
+import os               # for path manipulation
+import sys              # for the module search path
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Module inclusions
+from client_harness import run_client
+from snowserve.endpoints import EndpointRegistry
+
+# client threads end themselves with sys.exit(), which pytest reports as an
+# unhandled thread exception
+pytestmark = pytest.mark.filterwarnings(
+    "ignore::pytest.PytestUnhandledThreadExceptionWarning")
+
+
+def make_registry():
+    registry = EndpointRegistry(False)
+    registry.register("/upload", "sample_endpoints:EchoEndpoint")
+    registry.register("/broken", "sample_endpoints:BrokenEndpoint")
+    registry.register("/missing", "sample_endpoints:NoSuchEndpoint")
+    return registry
+
+
+def test_new_target_is_dispatched():
+    registry = make_registry()
+    # nothing is loaded until a request comes in
+    assert registry.endpoints == {}
+    response = run_client(registry, b"POST /upload HTTP/1.1\r\n"
+                                    b"Content-Length: 5\r\n\r\nhello")
+    assert response == b"HTTP/1.1 200 OK\r\n\r\n/upload 5"
+    assert list(registry.endpoints) == ["/upload"]
+
+
+def test_query_string_is_ignored():
+    response = run_client(make_registry(), b"GET /upload?a=1 HTTP/1.1\r\n\r\n")
+    assert response == b"HTTP/1.1 200 OK\r\n\r\n/upload?a=1 0"
+
+
+def test_unregistered_target_is_rejected():
+    response = run_client(make_registry(), b"GET /nowhere HTTP/1.1\r\n\r\n")
+    assert response.endswith(b"Parse Error: 3")
+
+
+def test_broken_endpoint_closes_connection():
+    response = run_client(make_registry(), b"GET /broken HTTP/1.1\r\n\r\n")
+    assert response == b"HTTP/1.1 500 Internal Server Error\r\n\r\n"
+
+
+def test_unloadable_endpoint_is_a_server_error():
+    response = run_client(make_registry(), b"GET /missing HTTP/1.1\r\n\r\n")
+    assert response == b"HTTP/1.1 500 Internal Server Error\r\n\r\n"
+
+
+# ========================== Entry Point Scanning =========================== #
+# A stand-in for an entry point from an installed package
+class FakeEntryPoint:
+    def __init__(self, name):
+        self.name = name
+
+    def load(self):
+        from sample_endpoints import EchoEndpoint
+        return EchoEndpoint
+
+
+# Replaces the entry point scan with one that counts how often it runs and
+# advertises a single endpoint on "/plugin"
+@pytest.fixture
+def scans(monkeypatch):
+    import importlib.metadata
+    count = [0]
+    def entry_points(group):
+        count[0] += 1
+        return [FakeEntryPoint("/plugin"), FakeEntryPoint("/upload")]
+    monkeypatch.setattr(importlib.metadata, "entry_points", entry_points)
+    return count
+
+
+def test_create_server_does_not_scan_entry_points(scans):
+    from snowserve.server import create_server
+    create_server({"endpoints": {"/upload": "sample_endpoints:EchoEndpoint"}})
+    assert scans[0] == 0
+
+
+def test_entry_points_scanned_once_on_unknown_target(scans):
+    registry = make_registry()
+    registry.load_entry_points()
+
+    # targets registered directly never need the scan
+    assert "/upload" in registry
+    assert scans[0] == 0
+
+    # the first unknown target triggers it, and only once
+    response = run_client(registry, b"GET /plugin HTTP/1.1\r\n\r\n")
+    assert response == b"HTTP/1.1 200 OK\r\n\r\n/plugin 0"
+    assert "/nowhere" not in registry
+    assert scans[0] == 1
+
+    # a directly registered endpoint wins over an entry point
+    assert registry.specs["/upload"] == "sample_endpoints:EchoEndpoint"
@@ -0,0 +1,171 @@
+# Tests for HTTPRequestBody: streaming a body off of a (fake) socket, sending
+# "100 Continue" only when the body is actually read, and spooling large
+# bodies to disk.
+#
+# Run with: python3 -m pytest tests
+#
+#   Connor Shugg
+
+# Library inclusions
+import os               # for path manipulation
+import sys              # for the module search path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "src"))
+
+# Module inclusions
+from snowserve import http_messages
+from snowserve.http_messages import HTTPRequest, HTTPParseError
+
+
+# ============================ Fake Talker Class ============================ #
+# A stand-in for SocketTalker that hands out the given data from read() and
+# records everything passed to write()
+class FakeTalker:
+    # Constructor: takes in the bytes the "client" will send
+    def __init__(self, data):
+        self.data = data
+        self.reads = 0
+        self.written = []
+
+    # Returns up to 'limit' bytes, or None once there's nothing left
+    def read(self, limit = 1024):
+        if (len(self.data) == 0):
+            return None
+        self.reads += 1
+        chunk = self.data[:limit]
+        self.data = self.data[limit:]
+        return chunk
+
+    def write(self, msg):
+        self.written.append(msg)
+
+
+# Takes in the request headers (as a string), the body bytes that came in with
+# them, and a FakeTalker, and returns a parsed request with its body attached
+def make_request(head, initial, talker):
+    req = HTTPRequest(head)
+    assert req.parse() == 0
+    assert req.attach_body(talker, initial) == 0
+    return req
+
+
+# ============================== Stream Tests =============================== #
+def test_chunks_read_rest_from_talker():
+    talker = FakeTalker(b"world, and more")
+    req = make_request("POST / HTTP/1.1\r\nContent-Length: 20\r\n\r\n",
+                       b"hello", talker)
+    chunks = list(req.body.chunks(4))
+    # the early bytes come first, then the rest comes off the socket in chunks
+    # no bigger than asked for
+    assert b"".join(chunks) == b"helloworld, and more"
+    assert max(len(c) for c in chunks) <= 4
+    assert talker.reads > 0
+
+
+def test_chunks_stop_at_content_length():
+    talker = FakeTalker(b"12345GET / HTTP/1.1\r\n\r\n")
+    req = make_request("POST / HTTP/1.1\r\nContent-Length: 8\r\n\r\n",
+                       b"abc", talker)
+    assert b"".join(req.body.chunks()) == b"abc12345"
+    # nothing past the body was pulled off the socket
+    assert talker.data == b"GET / HTTP/1.1\r\n\r\n"
+
+
+def test_chunks_cut_short_by_closed_socket():
+    talker = FakeTalker(b"abc")
+    req = make_request("POST / HTTP/1.1\r\nContent-Length: 100\r\n\r\n",
+                       b"", talker)
+    assert b"".join(req.body.chunks()) == b"abc"
+
+
+def test_no_content_length_means_no_body():
+    talker = FakeTalker(b"leftover")
+    req = make_request("GET / HTTP/1.1\r\n\r\n", b"", talker)
+    assert req.body == None
+    assert talker.reads == 0
+
+
+def test_leftover_without_content_length_is_not_body():
+    # bytes after the headers (a pipelined request, stray CRLFs) aren't part
+    # of a request that didn't say it has a body
+    talker = FakeTalker(b"")
+    req = make_request("POST / HTTP/1.1\r\n\r\n",
+                       b"GET / HTTP/1.1\r\n\r\n", talker)
+    assert req.body == None
+
+    req = HTTPRequest("GET / HTTP/1.1\r\n\r\n\r\n\r\n")
+    assert req.parse() == 0
+    assert req.body == None
+
+
+def test_transfer_encoding_rejected():
+    req = HTTPRequest("POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n")
+    assert req.parse() == 0
+    err = req.attach_body(FakeTalker(b"4\r\nbody\r\n0\r\n\r\n"), b"")
+    assert err == HTTPParseError.BAD_ENCODING
+
+
+# ============================ 100-Continue Tests =========================== #
+EXPECT_HEAD = "POST / HTTP/1.1\r\nContent-Length: 10\r\n" \
+              "Expect: 100-continue\r\n\r\n"
+
+def test_continue_not_sent_until_read():
+    talker = FakeTalker(b"0123456789")
+    req = make_request(EXPECT_HEAD, b"", talker)
+    # an endpoint that never reads the body never asks for it
+    assert talker.written == []
+    req.body.close()
+    assert talker.written == []
+
+
+def test_continue_sent_once():
+    talker = FakeTalker(b"0123456789")
+    req = make_request(EXPECT_HEAD, b"", talker)
+    assert b"".join(req.body.chunks(2)) == b"0123456789"
+    assert talker.written == ["HTTP/1.1 100 Continue\r\n\r\n"]
+
+
+def test_continue_not_sent_without_expect():
+    talker = FakeTalker(b"0123456789")
+    req = make_request("POST / HTTP/1.1\r\nContent-Length: 10\r\n\r\n", b"",
+                       talker)
+    req.body.read()
+    assert talker.written == []
+
+
+def test_continue_not_sent_when_body_already_read():
+    # the client sent the body anyway; there's nothing to ask for
+    talker = FakeTalker(b"")
+    req = make_request(EXPECT_HEAD, b"0123456789", talker)
+    assert req.body.read() == b"0123456789"
+    assert talker.written == []
+
+
+# ============================== Spool Tests ================================ #
+def test_small_body_stays_in_memory(monkeypatch):
+    monkeypatch.setattr(http_messages, "BODY_SPOOL_THRESHOLD", 1024)
+    talker = FakeTalker(b"x" * 512)
+    req = make_request("POST / HTTP/1.1\r\nContent-Length: 512\r\n\r\n", b"",
+                       talker)
+    spooled = req.body.spool()
+    assert not spooled._rolled
+    assert spooled.read() == b"x" * 512
+    req.body.close()
+
+
+def test_large_body_spools_to_disk(monkeypatch):
+    monkeypatch.setattr(http_messages, "BODY_SPOOL_THRESHOLD", 1024)
+    data = bytes(range(256)) * 64
+    talker = FakeTalker(data[100:])
+    req = make_request("POST / HTTP/1.1\r\nContent-Length: %d\r\n\r\n"
+                       % len(data), data[:100], talker)
+    spooled = req.body.spool()
+    assert spooled._rolled
+    assert spooled.read() == data
+
+    # once spooled, the body can be read again (from the file)
+    assert req.body.spool() is spooled
+    assert b"".join(req.body.chunks()) == data
+    req.body.close()
+    assert spooled.closed
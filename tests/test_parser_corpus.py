@@ -0,0 +1,148 @@
+# Corpus-driven tests for HTTPRequest.parse(): checks the parse result for
+# every request in parser_corpus.py, makes sure no input can hang the parser
+# (or a client thread), and checks that the parser's cost per byte doesn't
+# grow with input size.
+#
+# Run with: python3 -m pytest tests
+#
+#   Connor Shugg
+
+# Library inclusions
+import os               # for path manipulation
+import sys              # for the module search path
+import threading        # for running parses with a timeout
+from time import perf_counter   # for timing parses
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Module inclusions
+from parser_corpus import CORPORA, RAW_GARBAGE, ADVERSARIAL_KINDS, adversarial
+from client_harness import run_client
+from snowserve.http_messages import HTTPRequest, HTTPEnforcer, HTTPParseError
+
+# Global variables
+PARSE_TIMEOUT = 5.0     # seconds before a parse is considered hung
+SCALE = 8               # how much bigger the large linear-time input is
+# the cost per byte of parsing the large input may be at most this many times
+# the cost for the small one. Linear parsing keeps it near 1; quadratic would
+# make it about SCALE
+PER_BYTE_SLACK = 3.0
+TIMING_ROUNDS = 7       # timing rounds per input (the fastest one is used)
+ROUND_SECONDS = 0.02    # minimum time spent parsing in each round
+
+
+# Takes in request text and parses it on a separate thread, so a parser bug
+# that loops forever fails the test instead of hanging the suite. Returns the
+# request object and the parse result
+def parse_with_timeout(text, enforcer = None):
+    req = HTTPRequest(text, enforcer)
+    result = []
+    thread = threading.Thread(target=lambda: result.append(req.parse()),
+                              daemon=True)
+    thread.start()
+    thread.join(PARSE_TIMEOUT)
+    if (thread.is_alive()):
+        pytest.fail("parse did not finish within %.1f seconds" % PARSE_TIMEOUT)
+    if (len(result) == 0):
+        pytest.fail("parse raised an exception")
+    return (req, result[0])
+
+
+# Returns an enforcer with no header limit, so the parser walks every line of
+# the input instead of stopping after the first 64
+def unlimited_enforcer():
+    enforcer = HTTPEnforcer()
+    enforcer.header_limit = 10 ** 9
+    return enforcer
+
+
+# Takes in request text and returns the time it takes to parse, per byte.
+# Each round parses the text over and over for at least ROUND_SECONDS so
+# timer resolution doesn't matter, and the fastest round is used so a busy
+# machine doesn't either
+def time_per_byte(text):
+    best = None
+    for i in range(TIMING_ROUNDS):
+        count = 0
+        start = perf_counter()
+        elapsed = 0.0
+        while (elapsed < ROUND_SECONDS):
+            HTTPRequest(text, unlimited_enforcer()).parse()
+            count += 1
+            elapsed = perf_counter() - start
+        cost = elapsed / (count * len(text))
+        if (best == None or cost < best):
+            best = cost
+    return best
+
+
+# ============================== Corpus Tests =============================== #
+ENTRIES = [(corpus, entry) for corpus in CORPORA for entry in CORPORA[corpus]]
+
+@pytest.mark.parametrize("corpus,entry", ENTRIES,
+                         ids=["%s: %s" % (c, e[0]) for (c, e) in ENTRIES])
+def test_corpus(corpus, entry):
+    (name, text, expected, fields) = entry
+    (req, result) = parse_with_timeout(text)
+
+    # every parse has to come back with 0 or a parse error
+    assert result == 0 or isinstance(result, HTTPParseError)
+    if (expected != None):
+        assert result == expected
+    if (fields != None):
+        for key in fields:
+            assert getattr(req, key) == fields[key]
+
+
+def test_body_is_streamed():
+    (req, result) = parse_with_timeout(
+        "POST / HTTP/1.1\r\nContent-Length: 13\r\n\r\nhello\r\nworld!")
+    assert result == 0
+    assert b"".join(req.body.chunks(4)) == b"hello\r\nworld!"
+
+
+# ========================== Client Decoding Tests ========================== #
+# client threads end themselves with sys.exit(), which pytest reports as an
+# unhandled thread exception
+@pytest.mark.filterwarnings(
+    "ignore::pytest.PytestUnhandledThreadExceptionWarning")
+@pytest.mark.parametrize("entry", RAW_GARBAGE,
+                         ids=[e[0] for e in RAW_GARBAGE])
+def test_raw_garbage_through_client(entry):
+    (name, data) = entry
+    # the bytes go through the client thread's own UTF-8 decode and parse.
+    # Whatever happens, the thread has to finish and close the connection
+    response = run_client(None, data)
+    try:
+        data.decode("utf-8")
+    except UnicodeDecodeError:
+        # undecodable requests are dropped without a response
+        assert response == b""
+        return
+    if (len(data) > 0):
+        assert response.startswith(b"HTTP 200 OK\r\n\r\nParse Error: ")
+
+
+def test_body_is_cut_at_content_length():
+    (req, result) = parse_with_timeout(
+        "POST / HTTP/1.1\r\nContent-Length: 5\r\n\r\nhello world")
+    assert result == 0
+    assert req.body.read() == b"hello"
+
+
+# ============================ Linear-Time Tests ============================ #
+@pytest.mark.parametrize("kind", ADVERSARIAL_KINDS)
+def test_linear_time(kind):
+    small = adversarial(kind, 1000)
+    large = adversarial(kind, 1000 * SCALE)
+    # make sure neither input hangs before timing them
+    parse_with_timeout(small, unlimited_enforcer())
+    parse_with_timeout(large, unlimited_enforcer())
+
+    small_cost = time_per_byte(small)
+    large_cost = time_per_byte(large)
+    assert large_cost < small_cost * PER_BYTE_SLACK, \
+           "%s: %.3g s/byte at 1x, %.3g s/byte at %dx" % \
+           (kind, small_cost, large_cost, SCALE)
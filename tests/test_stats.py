@@ -0,0 +1,302 @@
+# Tests for SharedStats (per-worker counters and the rate-limit hash table
+# in shared memory) and for how the server creates and removes its region.
+#
+# Run with: python3 -m pytest tests
+#
+#   Connor Shugg
+
+# Library inclusions
+import os               # for path manipulation
+import sys              # for the module search path
+import struct           # for reading hash table slots
+import subprocess       # for getting the PID of a process that's gone
+from multiprocessing import shared_memory
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "src"))
+
+# Module inclusions
+from snowserve import stats as stats_module
+from snowserve.stats import SharedStats, stats_name, \
+                            SLOT_FORMAT, SLOT_PROBE_LIMIT, HEADER_FORMAT
+from snowserve.server import create_server
+from client_harness import run_client
+
+
+# Returns a region name that no other test (or test run) is using
+def region_name(tag):
+    return "snowserve_test_%d_%s" % (os.getpid(), tag)
+
+
+# Returns True if a shared memory region with the given name exists
+def region_exists(name):
+    try:
+        shm = shared_memory.SharedMemory(name)
+    except FileNotFoundError:
+        return False
+    shm.close()
+    return True
+
+
+# Creates a region for a test and removes it afterwards
+@pytest.fixture
+def owner(request):
+    stats = SharedStats(False, region_name(request.node.name[:20]), True,
+                        3, SLOT_PROBE_LIMIT)
+    yield stats
+    stats.close()
+
+
+# Replaces the clock the rate limiter uses with one the test controls
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(stats_module, "monotonic", lambda: now[0])
+    return now
+
+
+# ============================== Counter Tests ============================== #
+def test_counters_sum_across_workers(owner):
+    # attach one view per worker, the way worker processes and the stat CLI
+    # see the region
+    views = [SharedStats(False, owner.name) for w in range(3)]
+    for (w, view) in enumerate(views):
+        view.set_worker(w)
+        view.increment("requests", w + 1)
+        view.increment("connections_opened", 2)
+    views[0].increment("connections_closed", 5)
+
+    assert owner.read("requests") == 6
+    assert [owner.read("requests", w) for w in range(3)] == [1, 2, 3]
+    snap = owner.snapshot()
+    assert snap["connections_opened"] == 6
+    assert snap["connections_closed"] == 5
+    assert snap["connections_active"] == 1
+    assert snap["parse_errors"] == 0
+    for view in views:
+        view.close()
+
+
+def test_attached_view_does_not_remove_region(owner):
+    view = SharedStats(False, owner.name)
+    view.close()
+    assert region_exists(owner.name)
+
+
+def test_closed_stats_drop_updates(owner):
+    view = SharedStats(False, owner.name)
+    view.close()
+    # client threads may still be holding onto a closed view
+    view.increment("requests")
+    assert view.take_token("10.0.0.1", 0, 1)
+    assert owner.read("requests") == 0
+
+
+def test_attach_rejects_foreign_region():
+    name = region_name("foreign")
+    raw = shared_memory.SharedMemory(name, True, 4096)
+    raw.buf[:8] = b"NOTSNOW!"
+    try:
+        with pytest.raises(ValueError):
+            SharedStats(False, name)
+    finally:
+        raw.close()
+        raw.unlink()
+
+
+def test_attach_missing_region():
+    with pytest.raises(FileNotFoundError):
+        SharedStats(False, region_name("missing"))
+
+
+def test_create_refuses_live_region(owner):
+    # the region's creator (this process) is still running, so a second
+    # server has to leave it alone
+    assert owner.pid == os.getpid()
+    with pytest.raises(FileExistsError):
+        SharedStats(False, owner.name, True)
+    assert region_exists(owner.name)
+    view = SharedStats(False, owner.name)
+    assert view.pid == os.getpid()
+    view.close()
+
+
+def test_create_refuses_foreign_region():
+    name = region_name("foreign_create")
+    raw = shared_memory.SharedMemory(name, True, 4096)
+    raw.buf[:8] = b"NOTSNOW!"
+    try:
+        with pytest.raises(FileExistsError):
+            SharedStats(False, name, True)
+        assert bytes(raw.buf[:8]) == b"NOTSNOW!"
+    finally:
+        raw.close()
+        raw.unlink()
+
+
+def test_create_replaces_dead_region():
+    # a process that has exited leaves its PID behind in the header
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    name = region_name("dead")
+    stats = SharedStats(False, name, True)
+    header = struct.unpack_from(HEADER_FORMAT, stats.shm.buf, 0)
+    struct.pack_into(HEADER_FORMAT, stats.shm.buf, 0,
+                     *(header[:-1] + (proc.pid,)))
+    # forget about the region without removing it, as if the server crashed
+    stats.owner = False
+    stats.close()
+
+    replacement = SharedStats(False, name, True)
+    try:
+        assert replacement.pid == os.getpid()
+        assert replacement.read("requests") == 0
+    finally:
+        replacement.close()
+    assert not region_exists(name)
+
+
+# ============================ Rate-Limit Tests ============================= #
+# Takes in a SharedStats and returns the key stored in every used slot
+def slot_keys(stats):
+    keys = []
+    for slot in range(stats.slots):
+        (h, key, tokens, stamp) = struct.unpack_from(
+            SLOT_FORMAT, stats.shm.buf, stats.slot_offset(slot))
+        if (h != 0):
+            keys.append(key.rstrip(b"\0").decode("utf-8"))
+    return keys
+
+
+def test_burst_then_refill(owner, clock):
+    # a new bucket allows a full burst...
+    for i in range(3):
+        assert owner.take_token("10.0.0.1", 2.0, 3)
+    assert not owner.take_token("10.0.0.1", 2.0, 3)
+
+    # ...and refills at the given rate
+    clock[0] += 0.5
+    assert owner.take_token("10.0.0.1", 2.0, 3)
+    assert not owner.take_token("10.0.0.1", 2.0, 3)
+
+    # but never past the burst size
+    clock[0] += 100.0
+    for i in range(3):
+        assert owner.take_token("10.0.0.1", 2.0, 3)
+    assert not owner.take_token("10.0.0.1", 2.0, 3)
+
+
+def test_buckets_are_per_key(owner, clock):
+    assert owner.take_token("10.0.0.1", 0.0, 1)
+    assert not owner.take_token("10.0.0.1", 0.0, 1)
+    assert owner.take_token("10.0.0.2", 0.0, 1)
+    assert owner.table_usage() == 2
+
+
+def test_buckets_shared_between_views(owner, clock):
+    view = SharedStats(False, owner.name)
+    assert owner.take_token("10.0.0.1", 0.0, 1)
+    assert not view.take_token("10.0.0.1", 0.0, 1)
+    view.close()
+
+
+def test_full_table_evicts_oldest(owner, clock):
+    # the table is exactly SLOT_PROBE_LIMIT slots, so every key probes every
+    # slot. Fill it, one key per tick, draining each bucket
+    keys = ["10.0.0.%d" % i for i in range(SLOT_PROBE_LIMIT + 1)]
+    for key in keys[:-1]:
+        assert owner.take_token(key, 0.0, 1)
+        clock[0] += 1.0
+    assert owner.table_usage() == SLOT_PROBE_LIMIT
+
+    # one more key takes the slot of the least recently touched bucket
+    assert owner.take_token(keys[-1], 0.0, 1)
+    clock[0] += 1.0
+    assert keys[0] not in slot_keys(owner)
+    assert owner.table_usage() == SLOT_PROBE_LIMIT
+
+    # the other buckets kept their state...
+    assert not owner.take_token(keys[1], 0.0, 1)
+    clock[0] += 1.0
+    # ...while the evicted key starts over with a full bucket, pushing out
+    # the next-oldest one (keys[1] was just touched, so keys[2])
+    assert owner.take_token(keys[0], 0.0, 1)
+    assert keys[2] not in slot_keys(owner)
+    assert keys[1] in slot_keys(owner)
+
+
+# ========================== Client Counting Tests ========================== #
+# client threads end themselves with sys.exit(), which pytest reports as an
+# unhandled thread exception
+@pytest.mark.filterwarnings(
+    "ignore::pytest.PytestUnhandledThreadExceptionWarning")
+@pytest.mark.parametrize("request_bytes", [
+    b"GET / HTTP/1.1\r\n\r\n",                 # parses cleanly
+    b"BREW / HTTP/1.1\r\n\r\n",                # parse error
+    b"GET /\xff HTTP/1.1\r\n\r\n",             # can't be decoded
+    b"GET / HTTP/1.1\r\nX: " + b"a" * 9000,     # headers too long
+], ids=["ok", "parse error", "bad utf-8", "too long"])
+def test_client_counts_every_request(owner, request_bytes):
+    run_client(None, request_bytes, owner)
+    snap = owner.snapshot()
+    # every request is counted, and parse errors never outnumber requests
+    assert snap["requests"] == 1
+    assert snap["parse_errors"] <= snap["requests"]
+    assert snap["connections_closed"] == 1
+
+
+# ========================== Server Region Tests ============================ #
+def make_server():
+    return create_server({"port": 0, "accepters6": 0, "entry_points": False})
+
+
+def test_port_zero_servers_get_their_own_regions():
+    first = make_server()
+    second = make_server()
+    first.listen()
+    second.listen()
+    try:
+        # each region is named after the port that was actually bound
+        assert first.port != 0 and second.port != 0
+        assert first.stats.name == stats_name(first.port)
+        assert second.stats.name == stats_name(second.port)
+        assert region_exists(first.stats.name)
+        assert region_exists(second.stats.name)
+    finally:
+        first.stop()
+        second.stop()
+
+
+def test_second_server_on_same_port_refused():
+    # an IPv4-only and an IPv6-only server can both bind the same port
+    # number, but only one of them gets the stats region. (The second server
+    # here binds nothing, so the test doesn't depend on IPv6 being available)
+    first = make_server()
+    first.listen()
+    second = create_server({"port": first.port, "accepters4": 0,
+                            "accepters6": 0, "entry_points": False})
+    try:
+        with pytest.raises(FileExistsError):
+            second.listen()
+        assert second.stats == None
+        assert region_exists(first.stats.name)
+        assert first.stats.read("requests") == 0
+    finally:
+        first.stop()
+
+
+# the fake connection that wakes the accepter up is handed to a client
+# thread, which ends itself with sys.exit()
+@pytest.mark.filterwarnings(
+    "ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_stop_removes_region():
+    server = make_server()
+    server.start()
+    name = server.stats.name
+    assert region_exists(name)
+    server.stop()
+    assert not region_exists(name)
+    assert not any(a.is_alive() for a in server.accepters4)